@@ -1,9 +1,91 @@
 # B22ES027.py
+import os
 import sys
 import copy
 import time
+import pickle
+import random
+import heapq
+import inspect
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain
 from config import *
-from board import Board
+
+# Score bound for alpha-beta windows. Evaluations are ints, so an int sentinel
+# keeps every window comparison an int compare.
+INF = 10 ** 9
+
+# Zobrist keys: one random 64-bit value per (piece, square) plus side to move.
+# Seeded so hashes are reproducible between runs.
+_ZOBRIST_RNG = random.Random(0xC0FFEE)
+_ZOBRIST = {piece: [_ZOBRIST_RNG.getrandbits(64) for _ in range(BOARD_WIDTH * BOARD_HEIGHT)]
+            for piece in PIECE_VALUES}
+_ZOBRIST_TURN = _ZOBRIST_RNG.getrandbits(64)
+
+# Victim values for MVV ordering, keyed by whatever the board uses for a captured
+# piece: GameEngine codes ('bN'), single letters ('N'/'n') or None/empty for quiet moves.
+_MVV = {None: 0, EMPTY_SQUARE: 0, '.': 0}
+for _piece, _value in PIECE_VALUES.items():
+    _MVV[_piece] = _MVV[_piece[1]] = _MVV[_piece[1].lower()] = abs(_value)
+_MVV_UNKNOWN = 40   # capture whose victim we cannot identify
+
+# Move-ordering tiers: captures (by victim), then killers, then quiet moves by
+# history score, which stays far below KILLER_SCORE.
+CAPTURE_SCORE = 1 << 30
+KILLER_SCORE = 1 << 29
+_NO_KILLERS = ()
+
+# _alphabeta reads the clock once every TIME_CHECK_MASK + 1 calls. GameEngine move
+# generation keeps this search at a few thousand nodes per second, so 128 calls
+# is well under the ~0.1 s safety margin left by time_limit.
+TIME_CHECK_MASK = 127
+
+# Half-width of the first aspiration window around the previous iteration's score
+# (a pawn is 20). Each failure widens it ASPIRATION_GROWTH times until it exceeds
+# ASPIRATION_MAX, after which the root is searched with a full window.
+ASPIRATION_WINDOW = 50
+ASPIRATION_GROWTH = 4
+ASPIRATION_MAX = 1000
+
+# Null-move depth reduction: after passing the turn, search depth - 1 - R.
+NULL_MOVE_R = 2
+
+# Root splitting: once the first root move has been searched, the remaining root
+# moves are scored in worker processes, but only from this depth up; shallower
+# iterations finish faster than the processes can be fed.
+PARALLEL_MIN_DEPTH = 4
+
+# Plies below the root with a pooled legal-move list; deeper nodes (long capture
+# sequences in quiescence) fall back to a fresh list.
+MAX_PLY = 64
+
+# Iterative deepening starts another iteration only if its predicted cost (last
+# iteration time times the observed branching factor, clamped to this range)
+# still fits before the deadline.
+ID_DEFAULT_EBF = 4.0
+ID_MIN_EBF = 1.5
+ID_MAX_EBF = 8.0
+
+# Game clock, as game_runner sets it up: each side has GAME_TIME seconds for
+# its half of at most GAME_TURNS plies. A move's budget is the remaining clock
+# (board.time_left, else GAME_TIME less our own thinking time so far) spread
+# over our remaining moves, and never below MIN_MOVE_TIME.
+GAME_TIME = 60.0
+GAME_TURNS = 150
+MIN_MOVE_TIME = 0.02
+
+# Transposition table: a fixed power-of-two list of
+# (key, value, depth, flag, gen, best_move, static_eval) tuples. Each bucket is
+# an even/odd slot pair: the even slot keeps the deepest entry of the current
+# search, the odd slot is always replaced.
+TT_SIZE = 1 << 18
+TT_EXACT = 0   # value is exact (alpha < value < beta)
+TT_LOWER = 1   # fail-high: true value >= stored value
+TT_UPPER = 2   # fail-low: true value <= stored value
+TT_DEPTH_NONE = -1  # entry carries only a cached static eval, never a search result
 
 class B22ES027:
     """
@@ -16,13 +98,28 @@ class B22ES027:
     def __init__(self, board):
         self.board = board
         self.nodes_expanded = 0
-        self.depth = 3           # default search depth (can be changed)
+        self.depth = 8           # cap on iterative deepening; the move budget usually stops it first
         self.time_limit = 0.9    # fraction of allowed time to use for iterative deepening (if using timing)
         self.start_time = None
         self.max_time = None
-        self.transposition_table = {}  # simple Zobrist-like TT keyed by board hash
-        self.KILLER_MOVES = {}         # optional killer move heuristic
+        self._time_used = 0.0          # thinking time spent this game, for boards without time_left
+        self._moves_made = 0           # get_best_move calls, for boards without a move_log
+        self._deadline = None          # absolute time at which the search must stop
+        self._tick = 0                 # _alphabeta calls since the last iteration started
+        self._in_null = False          # inside a null-move search (no nested null moves)
+        self._move_lists = [[] for _ in range(MAX_PLY)]  # reusable legal-move list per ply
+        self.transposition_table = [None] * TT_SIZE  # bucketed TT indexed by Zobrist key
+        self._tt_mask = (TT_SIZE - 1) & ~1
+        self._tt_gen = 0               # search generation, bumped on every get_best_move
+        self._zkey = 0                 # Zobrist key of the current search position
+        self._key_stack = []           # keys saved by each make, restored on unmake
+        self.KILLER_MOVES = {}         # ply -> up to two move keys that caused a beta cutoff
+        self._history = {}             # move key -> sum of depth^2 over its beta cutoffs
         self.PV = []                   # principal variation (best line)
+        self.workers = min(4, os.cpu_count() or 1)  # processes for root splitting; 1 disables it
+        self._pool = None              # ProcessPoolExecutor, created on first split
+        self._split_seq = None         # shared id of the live root split, created with the pool
+        self._split_id = None          # in a worker: the split this task belongs to
         # Piece values according to assignment points
         self.PV_VALUES = {
             'P': 20,   # pawn
@@ -31,234 +128,775 @@ class B22ES027:
             'K': 10000 # king (very large)
         }
         self.CHECK_BONUS = 2
+        # (white, black) material of one piece, for GameEngine codes ('wN', 'bN')
+        # and single-letter boards ('N' white, 'n' black).
+        # _piece_minors counts knights and bishops the same way.
+        self._piece_material = {}
+        self._piece_minors = {}
+        for t, v in self.PV_VALUES.items():
+            self._piece_material[t] = self._piece_material['w' + t] = (v, 0)
+            self._piece_material[t.lower()] = self._piece_material['b' + t] = (0, v)
+            if t not in ('P', 'K'):
+                self._piece_minors[t] = self._piece_minors['w' + t] = (1, 0)
+                self._piece_minors[t.lower()] = self._piece_minors['b' + t] = (0, 1)
+        self._ptype_cache = {}         # piece type tag -> value, for piece-list boards
+        self._white_mat = 0            # material counters, kept in step by make/unmake
+        self._black_mat = 0
+        self._white_minors = 0         # knights and bishops, for the null-move zugzwang guard
+        self._black_minors = 0
+        self._bind_adapters()
 
     def get_best_move(self):
         """
         Returns the best move for current board state.
-        Uses iterative deepening with alpha-beta.
+        Uses iterative deepening with alpha-beta, driven by the time budget:
+        each iteration's cost predicts the next, and self.depth is only a cap.
         """
         self.start_time = time.time()
-        self.max_time = getattr(self.board, 'time_left', None)
-        if self.max_time is None:
-            self.max_time = 1.5
+        self._tt_gen = (self._tt_gen + 1) & 0xFF
+        # Killers are tied to plies of the previous tree; history is only aged.
+        self.KILLER_MOVES = {}
+        self._history = {k: v >> 1 for k, v in self._history.items() if v > 1}
+        self.max_time = self._move_budget()
+        self._begin_search(self.start_time + min(self.max_time * self.time_limit, 0.95 * self.max_time))
 
         best_move = None
-        best_score = -float('inf')
+        best_score = -INF
         max_depth = self.depth
+        prev_time = None
+        d = 0
         try:
-            for d in range(1, max_depth + 1):
+            while d < max_depth:
+                d += 1
                 self.nodes_expanded = 0
-                score, move = self._alphabeta_root(d, -float('inf'), float('inf'))
+                self._tick = 0
+                iter_start = time.time()
+                if best_move is None:
+                    score, move = self._alphabeta_root(d, -INF, INF)
+                else:
+                    score, move = self._aspiration_root(d, best_score)
                 if move is not None:
                     best_move, best_score = move, score
-                if time.time() - self.start_time > min(self.max_time * self.time_limit, 0.95 * self.max_time):
+                # Predict the next iteration as this one times the observed
+                # branching factor (clamped, since very short iterations give
+                # noisy ratios) and only start it if it should finish in time.
+                now = time.time()
+                iter_time = now - iter_start
+                ebf = iter_time / prev_time if prev_time else ID_DEFAULT_EBF
+                ebf = min(max(ebf, ID_MIN_EBF), ID_MAX_EBF)
+                prev_time = iter_time
+                if now + iter_time * ebf > self._deadline:
                     break
         except TimeoutError:
             pass
+        self._time_used += time.time() - self.start_time
+        self._moves_made += 1
         return best_move
 
+    def _move_budget(self):
+        """Seconds for this move: the remaining clock over our remaining moves."""
+        remaining = getattr(self.board, 'time_left', None)
+        if remaining is None:
+            remaining = GAME_TIME - self._time_used
+        move_log = getattr(self.board, 'move_log', None)
+        plies = len(move_log) if move_log is not None else 2 * self._moves_made
+        moves_left = max(1, (GAME_TURNS - plies + 1) // 2)
+        return max(remaining / moves_left, MIN_MOVE_TIME)
+
+    def close(self):
+        """Shut down the root-split worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def __del__(self):
+        self.close()
+
+    def _out_of_time(self):
+        """Clock test for the search; a root-split task also stops once its split is over."""
+        if time.time() > self._deadline: return True
+        return self._split_id is not None and _WORKER_SPLIT.value != self._split_id
+
+    def _begin_search(self, deadline):
+        """Sync per-search state with the board: root key, material counters and clock."""
+        self._zkey = self._root_key()
+        self._key_stack = []
+        self._white_mat, self._black_mat = self._material_scan(self.board)
+        self._white_minors, self._black_minors = self._minor_scan(self.board)
+        self._deadline = deadline
+        self._tick = 0
+
     def evaluate_board(self):
         """Heuristic evaluation of the current board state."""
+        self._white_mat, self._black_mat = self._material_scan(self.board)
         return self._evaluate_board(self.board)
 
     # ---------------------------------------------------------------------
     # Helpers (same as before)
     # ---------------------------------------------------------------------
-    def _board_hash(self, board):
-        if hasattr(board, 'get_hash'): return board.get_hash()
-        if hasattr(board, 'zobrist_hash'): return board.zobrist_hash()
-        if hasattr(board, '__repr__'): return repr(board)
-        if hasattr(board, 'board'):
-            try: return tuple(tuple(row) for row in board.board)
-            except Exception: return str(board)
-        return str(board)
-
-    def _get_legal_moves(self, board):
-        if hasattr(board, 'get_legal_moves'): return list(board.get_legal_moves())
-        if hasattr(board, 'legal_moves'):
-            try: return list(board.legal_moves)
-            except Exception: return board.legal_moves
-        if hasattr(board, 'generate_legal_moves'): return list(board.generate_legal_moves())
-        if hasattr(board, 'moves'): return list(board.moves())
-        if hasattr(board, 'get_actions'): return list(board.get_actions())
-        raise RuntimeError("Adapt _get_legal_moves to your Board API")
-
-    def _make_move(self, board, move):
-        if hasattr(board, 'push'): return board.push(move)
-        if hasattr(board, 'make_move'): return board.make_move(move)
-        if hasattr(board, 'apply_move'): return board.apply_move(move)
-        if hasattr(board, 'after_move'): return board.after_move(move)
-        if hasattr(board, 'move'): return board.move(move)
-        raise RuntimeError("Adapt _make_move to your Board API")
-
-    def _undo_move(self, board, move):
-        if hasattr(board, 'pop'): return board.pop()
-        if hasattr(board, 'undo_move'): return board.undo_move(move)
-        if hasattr(board, 'unmake_move'): return board.unmake_move(move)
-        return None
+    def _bind_adapters(self):
+        """
+        Resolve the Board API once. The search calls these cached callables
+        instead of probing the board with hasattr() at every node.
+        """
+        board = self.board
+        self._has_push = hasattr(board, 'push')
+
+        # TT slots are indexed by key & mask, so every key is folded to an int.
+        if hasattr(board, 'get_hash'): self._hash = lambda: hash(board.get_hash())
+        elif hasattr(board, 'zobrist_hash'): self._hash = lambda: hash(board.zobrist_hash())
+        elif type(board).__repr__ is not object.__repr__: self._hash = lambda: hash(repr(board))
+        elif hasattr(board, 'board'):
+            # The grid alone would give both sides to move the same key.
+            side = 'white_to_move' if hasattr(board, 'white_to_move') else 'turn'
+            self._hash = lambda: hash((tuple(tuple(row) for row in board.board), getattr(board, side, None)))
+        else: self._hash = lambda: hash(str(board))
 
-    def _is_terminal(self, board):
-        if hasattr(board, 'is_game_over'): return board.is_game_over()
-        if hasattr(board, 'game_over'): return board.game_over()
-        if hasattr(board, 'is_terminal'): return board.is_terminal()
-        try: return len(self._get_legal_moves(board)) == 0
-        except Exception: return False
-
-    def _evaluate_board(self, board):
-        score = 0
-        our_side = getattr(self, 'side', None)
-        if our_side is None:
-            if hasattr(board, 'turn'):
-                our_side = board.turn
-            else:
-                our_side = 'W'
-
-        def material_from_piece_list(piece_list):
-            s = 0
-            for p in piece_list:
-                pt = getattr(p, 'type', None) or getattr(p, 'kind', None) or str(p)
-                pt = str(pt).upper()
-                if pt.startswith('P'): s += self.PV_VALUES['P']
-                elif pt.startswith('B'): s += self.PV_VALUES['B']
-                elif pt.startswith('N') or pt.startswith('KNT'): s += self.PV_VALUES['N']
-                elif pt.startswith('K') and not pt.startswith('KN'): s += self.PV_VALUES['K']
-            return s
+        # _gen_moves() returns a new list; _fill_moves(out) appends into a
+        # reusable one (GameEngine's generator does so without an extra list).
+        self._fill_moves = None
+        if all(hasattr(board, a) for a in ('_get_all_possible_moves', '_find_king', '_is_square_attacked')):
+            self._gen_moves = self._fill_moves = self._engine_legal_moves()
+        elif hasattr(board, 'get_legal_moves'):
+            moves = board.get_legal_moves()
+            if isinstance(moves, list): self._gen_moves = board.get_legal_moves
+            else: self._gen_moves = lambda: list(board.get_legal_moves())
+        elif hasattr(board, 'legal_moves'): self._gen_moves = lambda: list(board.legal_moves)
+        elif hasattr(board, 'generate_legal_moves'): self._gen_moves = lambda: list(board.generate_legal_moves())
+        elif hasattr(board, 'moves'): self._gen_moves = lambda: list(board.moves())
+        elif hasattr(board, 'get_actions'): self._gen_moves = lambda: list(board.get_actions())
+        else: raise RuntimeError("Adapt _bind_adapters to your Board API")
+        if self._fill_moves is None:
+            gen = self._gen_moves
+            self._fill_moves = lambda out: out.extend(gen())
+
+        # Move introspection used by ordering: what a move captures and a
+        # hashable identity (GameEngine moves define __eq__ but not __hash__).
+        sample = next(iter(self._gen_moves()), None)
+        if sample is None or hasattr(sample, 'piece_captured'): self._captured_of = lambda m: m.piece_captured
+        elif hasattr(sample, 'captured'): self._captured_of = lambda m: m.captured
+        else: self._captured_of = lambda m: 'x' if 'x' in str(m).lower() else None
+        if sample is None or hasattr(sample, 'start_row'):
+            # Packed from/to squares: an int hashes without building a tuple.
+            self._move_key = lambda m: (((m.start_row * BOARD_WIDTH + m.start_col) << 6)
+                                        | (m.end_row * BOARD_WIDTH + m.end_col))
+        else:
+            try:
+                hash(sample)
+                self._move_key = lambda m: m
+            except TypeError:
+                self._move_key = str
 
+        # Side-to-move polarity for _evaluate_board: +1 white, -1 black. Boards
+        # with no turn information are scored from white's view, as before.
+        turn = getattr(board, 'turn', None)
+        if hasattr(board, 'white_to_move'): self._turn_sign = lambda: 1 if board.white_to_move else -1
+        elif isinstance(turn, bool): self._turn_sign = lambda: 1 if board.turn else -1
+        elif isinstance(turn, str): self._turn_sign = lambda: 1 if board.turn[:1] in ('W', 'w') else -1
+        else: self._turn_sign = lambda: 1
+
+        # Passing the turn (null move, grid make) needs a writable side to move.
+        if hasattr(board, 'white_to_move'):
+            def flip_side(): board.white_to_move = not board.white_to_move
+        elif isinstance(getattr(board, 'turn', None), bool):
+            def flip_side(): board.turn = not board.turn
+        elif isinstance(getattr(board, 'turn', None), str):
+            # Swap between the board's own spellings ('w'/'b', 'White'/'Black', ...).
+            other = {'w': 'b', 'b': 'w', 'white': 'black', 'black': 'white'}.get(turn.lower())
+            if other is None: other = 'B' if turn[:1] in ('W', 'w') else 'W'
+            elif turn.isupper(): other = other.upper()
+            elif turn[:1].isupper(): other = other.capitalize()
+            opposite = {turn: other, other: turn}
+            def flip_side(): board.turn = opposite[board.turn]
+        else:
+            flip_side = None
+        self._flip_side = flip_side
+
+        # Check tests either take the side to test, is_in_check(color), or test
+        # the side to move (GameEngine's takes no argument).
+        check = getattr(board, 'is_in_check', None) or getattr(board, 'is_check', None)
+        takes_side = False
+        if check is not None:
+            try: takes_side = len(inspect.signature(check).parameters) > 0
+            except (TypeError, ValueError): takes_side = False
+
+        # Null-move pruning is only safe when we can tell the side to move is
+        # in check; without that test, report check so it is never tried.
+        if check is None: self._in_check = lambda: True
+        elif not takes_side: self._in_check = check
+        elif hasattr(board, 'turn'): self._in_check = lambda: check(board.turn)
+        else: self._in_check = lambda: True
+
+        # Check bonus in _evaluate_board: only boards whose is_in_check takes a side
+        # (GameEngine's takes none, so the call could only ever raise).
+        self._opp_in_check = None
+        if takes_side and hasattr(board, 'is_in_check'):
+            self._opp_in_check = lambda: board.is_in_check(not getattr(board, 'turn', True))
+
+        # Make/unmake always mutate the board in place; the search never copies it.
+        unmake = None
+        if hasattr(board, 'pop'): unmake = board.pop
+        elif hasattr(board, 'undo_move'): unmake = board.undo_move
+        elif hasattr(board, 'unmake_move'): unmake = board.unmake_move
+        if unmake is not None:
+            if self._has_push: self._do = board.push
+            elif hasattr(board, 'make_move'): self._do = board.make_move
+            elif hasattr(board, 'apply_move'): self._do = board.apply_move
+            elif hasattr(board, 'move'): self._do = board.move
+            else: raise RuntimeError("Adapt _bind_adapters to your Board API")
+            try: takes_move = len(inspect.signature(unmake).parameters) > 0
+            except (TypeError, ValueError): takes_move = False
+            self._undo = unmake if takes_move else (lambda move: unmake())
+        elif hasattr(board, 'board') and (sample is None or hasattr(sample, 'start_row')):
+            self._bind_grid_make()
+        else:
+            raise RuntimeError("Adapt _bind_adapters to your Board API")
+
+        # Keep self._zkey in step with the board. Grids of piece codes with
+        # GameEngine-style moves are hashed incrementally, and their material
+        # counters are updated from the captured piece; anything else is
+        # rehashed through self._hash after each make and rescanned per eval.
+        self._incremental = hasattr(board, 'board') and hasattr(board, 'white_to_move')
+        do, undo = self._do, self._undo
+        if self._incremental:
+            material = self._piece_material
+            minors = self._piece_minors
+            def do_hashed(move):
+                do(move)
+                frm = move.start_row * BOARD_WIDTH + move.start_col
+                to = move.end_row * BOARD_WIDTH + move.end_col
+                keys = _ZOBRIST[move.piece_moved]
+                key = self._zkey ^ keys[frm] ^ keys[to] ^ _ZOBRIST_TURN
+                captured = move.piece_captured
+                keys = _ZOBRIST.get(captured)
+                if keys is not None:
+                    key ^= keys[to]
+                    w, b = material[captured]
+                    self._white_mat -= w
+                    self._black_mat -= b
+                    n = minors.get(captured)
+                    if n is not None:
+                        self._white_minors -= n[0]
+                        self._black_minors -= n[1]
+                self._key_stack.append(self._zkey)
+                self._zkey = key
+            def undo_hashed(move):
+                undo(move)
+                self._zkey = self._key_stack.pop()
+                captured = material.get(move.piece_captured)
+                if captured is not None:
+                    self._white_mat += captured[0]
+                    self._black_mat += captured[1]
+                    n = minors.get(move.piece_captured)
+                    if n is not None:
+                        self._white_minors += n[0]
+                        self._black_minors += n[1]
+        else:
+            def do_hashed(move):
+                do(move)
+                self._key_stack.append(self._zkey)
+                self._zkey = self._hash()
+            def undo_hashed(move):
+                undo(move)
+                self._zkey = self._key_stack.pop()
+        self._do, self._undo = do_hashed, undo_hashed
+
+        # Explicit game-over test, if the board has one. Otherwise a node is
+        # terminal exactly when its (already generated) move list is empty.
+        if hasattr(board, 'is_game_over'): self._term = board.is_game_over
+        elif hasattr(board, 'game_over'): self._term = board.game_over
+        elif hasattr(board, 'is_terminal'): self._term = board.is_terminal
+        else: self._term = None
+
+    def _engine_legal_moves(self):
+        """
+        Legal-move generator for GameEngine. GameEngine.get_legal_moves runs a
+        full make_move/undo_move per pseudo-legal move, which rebuilds the
+        position-history tuples twice each time and dominates search time.
+        This filter does the same legality test with a raw two-square edit of
+        the grid and one attack query on our king, found once per call.
+        Returns the same moves in the same order, appended to the given list
+        if one is passed (see _ply_moves).
+        """
+        board = self.board
+        pseudo_moves = board._get_all_possible_moves
+        find_king = board._find_king
+        attacked = board._is_square_attacked
+
+        def legal_moves(legal=None):
+            grid = board.board
+            color = 'w' if board.white_to_move else 'b'
+            king = find_king(color)
+            if legal is None: legal = []
+            for move in pseudo_moves():
+                sr, sc, er, ec = move.start_row, move.start_col, move.end_row, move.end_col
+                piece = move.piece_moved
+                grid[sr][sc] = EMPTY_SQUARE
+                grid[er][ec] = piece
+                target = (er, ec) if piece[1] == 'K' else king
+                if target is not None and not attacked(target, color): legal.append(move)
+                grid[sr][sc] = piece
+                grid[er][ec] = move.piece_captured
+            return legal
+
+        return legal_moves
+
+    def _bind_grid_make(self):
+        """
+        Make/unmake for boards without an undo: edit board.board in place and
+        keep only the captured piece per ply, so unmake is a two-square write
+        rather than restoring a copy of the board.
+        """
+        board = self.board
+        captures = []
+        flip = self._flip_side
+        if flip is None: raise RuntimeError("Adapt _bind_grid_make to your Board API")
+        # Vacated squares get the board's own empty marker ('--', '.', None, ...);
+        # failing a known one, the most common cell, as most squares are empty.
+        cells = Counter(chain.from_iterable(board.board))
+        known = [cell for cell in cells if _MVV.get(cell, _MVV_UNKNOWN) == 0]
+        empty = known[0] if known else cells.most_common(1)[0][0]
+
+        def make(move):
+            grid = board.board
+            captures.append(grid[move.end_row][move.end_col])
+            grid[move.end_row][move.end_col] = grid[move.start_row][move.start_col]
+            grid[move.start_row][move.start_col] = empty
+            flip()
+
+        def unmake(move):
+            grid = board.board
+            grid[move.start_row][move.start_col] = grid[move.end_row][move.end_col]
+            grid[move.end_row][move.end_col] = captures.pop()
+            flip()
+
+        self._do, self._undo = make, unmake
+
+    def _root_key(self):
+        """Full Zobrist key of the current position, computed by walking the board."""
+        if not self._incremental: return self._hash()
+        key = 0
+        for r, row in enumerate(self.board.board):
+            for c, piece in enumerate(row):
+                keys = _ZOBRIST.get(piece)
+                if keys is not None: key ^= keys[r * BOARD_WIDTH + c]
+        if not self.board.white_to_move: key ^= _ZOBRIST_TURN
+        return key
+
+    def _piece_list_material(self, piece_list):
+        """Material of a list of piece objects; each distinct type tag is classified once."""
+        cache = self._ptype_cache
+        s = 0
+        for p in piece_list:
+            tag = getattr(p, 'type', None) or getattr(p, 'kind', None) or str(p)
+            value = cache.get(tag)
+            if value is None:
+                pt = str(tag).upper()
+                if pt.startswith('P'): value = self.PV_VALUES['P']
+                elif pt.startswith('B'): value = self.PV_VALUES['B']
+                elif pt.startswith('N') or pt.startswith('KN'): value = self.PV_VALUES['N']
+                elif pt.startswith('K') and not pt.startswith('KN'): value = self.PV_VALUES['K']
+                else: value = 0
+                cache[tag] = value
+            s += value
+        return s
+
+    def _material_scan(self, board):
+        """(white, black) material from a full walk of the board."""
         white_material = 0
         black_material = 0
         if hasattr(board, 'white_pieces') and hasattr(board, 'black_pieces'):
             try:
-                white_material = material_from_piece_list(board.white_pieces)
-                black_material = material_from_piece_list(board.black_pieces)
+                white_material = self._piece_list_material(board.white_pieces)
+                black_material = self._piece_list_material(board.black_pieces)
             except Exception:
                 white_material = black_material = 0
         elif hasattr(board, 'board'):
             try:
-                for row in board.board:
-                    for cell in row:
-                        if cell is None or cell == '.': continue
-                        cstr = str(cell)
-                        if cstr.isalpha() and len(cstr) == 1:
-                            if cstr.isupper():
-                                if cstr == 'P': white_material += self.PV_VALUES['P']
-                                elif cstr == 'B': white_material += self.PV_VALUES['B']
-                                elif cstr == 'N': white_material += self.PV_VALUES['N']
-                                elif cstr == 'K': white_material += self.PV_VALUES['K']
-                            else:
-                                if cstr.lower() == 'p': black_material += self.PV_VALUES['P']
-                                elif cstr.lower() == 'b': black_material += self.PV_VALUES['B']
-                                elif cstr.lower() == 'n': black_material += self.PV_VALUES['N']
-                                elif cstr.lower() == 'k': black_material += self.PV_VALUES['K']
+                # Count every cell in one C-level pass, then weight the few
+                # distinct piece codes instead of looking up each square.
+                material = self._piece_material
+                for cell, n in Counter(chain.from_iterable(board.board)).items():
+                    w, b = material.get(cell, (0, 0))
+                    white_material += w * n
+                    black_material += b * n
             except Exception:
-                pass
+                white_material = black_material = 0
+        return white_material, black_material
 
-        try: mobility = len(self._get_legal_moves(board))
+    def _minor_scan(self, board):
+        """(white, black) knight and bishop counts; boards without a grid count as having some."""
+        grid = getattr(board, 'board', None)
+        if grid is None: return 1, 1
+        white = black = 0
+        try:
+            minors = self._piece_minors
+            for cell, n in Counter(chain.from_iterable(grid)).items():
+                w, b = minors.get(cell, (0, 0))
+                white += w * n
+                black += b * n
+        except Exception:
+            return 1, 1
+        return white, black
+
+    def _side_has_minors(self):
+        """Whether the side to move has a knight or bishop, i.e. more than king and pawns."""
+        if self._incremental:
+            return (self._white_minors if self.board.white_to_move else self._black_minors) > 0
+        white, black = self._minor_scan(self.board)
+        return (white if self._turn_sign() > 0 else black) > 0
+
+    def _evaluate_board(self, board, legal_moves=None):
+        if self._incremental:
+            white_material, black_material = self._white_mat, self._black_mat
+        else:
+            white_material, black_material = self._material_scan(board)
+
+        try: mobility = len(legal_moves if legal_moves is not None else self._gen_moves())
         except Exception: mobility = 0
 
         opponent_in_check = False
-        if hasattr(board, 'is_in_check'):
-            try: opponent_in_check = board.is_in_check(not getattr(board, 'turn', True))
+        if self._opp_in_check is not None:
+            try: opponent_in_check = self._opp_in_check()
             except Exception: opponent_in_check = False
 
-        white_score = white_material
-        black_score = black_material
-        white_score += mobility * 1
-        if opponent_in_check:
-            if getattr(board, 'turn', 'W') == 'W':
-                white_score += self.CHECK_BONUS
-            else:
-                black_score += self.CHECK_BONUS
-
-        raw = white_score - black_score
-        if hasattr(board, 'turn'):
-            turn = getattr(board, 'turn')
-            if isinstance(turn, bool): return raw if turn else -raw
-            elif isinstance(turn, str): return raw if turn.upper().startswith('W') else -raw
-        return raw
+        # Mobility and the check bonus are credited to the side to move; material
+        # is turned from white-minus-black into the side to move's view.
+        bonus = mobility + (self.CHECK_BONUS if opponent_in_check else 0)
+        return self._turn_sign() * (white_material - black_material) + bonus
+
+    def _aspiration_root(self, depth, guess):
+        """
+        Search the root in a narrow window around guess, widening and
+        re-searching on fail-low/fail-high. Failed searches still leave their
+        bounds in the TT, which speeds up the re-search.
+        """
+        window = ASPIRATION_WINDOW
+        while window <= ASPIRATION_MAX:
+            alpha, beta = guess - window, guess + window
+            score, move = self._alphabeta_root(depth, alpha, beta)
+            if move is None or alpha < score < beta:
+                return score, move
+            window *= ASPIRATION_GROWTH
+        return self._alphabeta_root(depth, -INF, INF)
 
     def _alphabeta_root(self, depth, alpha, beta):
-        legal_moves = self._get_legal_moves(self.board)
+        legal_moves = self._gen_moves()
         if not legal_moves: return self.evaluate_board(), None
+        alpha_orig = alpha
         best_move = None
-        best_score = -float('inf')
-        ordered = sorted(legal_moves, key=self._move_sort_key, reverse=True)
-        for move in ordered:
-            if time.time() - self.start_time > min(self.max_time * self.time_limit, 0.95 * self.max_time):
+        best_score = -INF
+        entry = self._tt_probe(self._zkey)
+        ordered = list(self._order_moves(legal_moves, entry[5] if entry is not None else None))
+        for i, move in enumerate(ordered):
+            if time.time() > self._deadline:
                 raise TimeoutError()
-            undo_info = None
-            try:
-                if hasattr(self.board, 'push'):
-                    self.board.push(move); undo_info = True
-                else:
-                    new_board = self._make_move(self.board, move)
-                    old_board = self.board; self.board = new_board; undo_info = old_board
+            try: self._do(move)
             except: continue
-            score = -self._alphabeta(depth - 1, -beta, -alpha)
-            if undo_info is True and hasattr(self.board, 'pop'): self.board.pop()
-            elif undo_info is not None: self.board = undo_info
+            try: score = -self._alphabeta(depth - 1, -beta, -alpha)
+            finally: self._undo(move)
             if score > best_score:
                 best_score, best_move = score, move
             if best_score > alpha: alpha = best_score
             if alpha >= beta: break
+            if self.workers > 1 and depth >= PARALLEL_MIN_DEPTH:
+                # The first move has set alpha; score the rest in parallel.
+                split = self._split_root(ordered[i + 1:], depth, alpha, beta)
+                if split is None:
+                    # Unpicklable board or a dead worker: search the remaining
+                    # moves here, and stay sequential for the rest of the game.
+                    self.close()
+                    self.workers = 1
+                    continue
+                score, move = split
+                if move is not None and score > best_score:
+                    best_score, best_move = score, move
+                break
+        if best_move is not None:
+            self._tt_store(self._zkey, best_score, depth, self._bound_flag(best_score, alpha_orig, beta), best_move)
         return best_score, best_move
 
+    def _split_root(self, moves, depth, alpha, beta):
+        """
+        Root split (Young Brothers Wait): score moves in worker processes, each
+        on its own copy of the board and with its own TT, using the window
+        established by the first root move. Returns (best_score, best_move);
+        ties go to the earlier move in ordering so results are deterministic.
+        Returns None if the board cannot be pickled or the pool has broken.
+        """
+        if not moves: return -INF, None
+        try: state = pickle.dumps(self.board)
+        except (pickle.PicklingError, TypeError, AttributeError): return None
+        if self._pool is None:
+            self._split_seq = multiprocessing.RawValue('q', 0)
+            self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                             initargs=(self._split_seq,))
+        self._split_seq.value += 1
+        split_id = self._split_seq.value
+        futures = {}
+        best_score, best_index = -INF, None
+        try:
+            for i, move in enumerate(moves):
+                futures[self._pool.submit(_worker_score, state, move, depth, alpha, beta, self._deadline,
+                                          split_id)] = i
+            for future in as_completed(futures):
+                score, nodes = future.result()
+                self.nodes_expanded += nodes
+                i = futures[future]
+                if score > best_score or (score == best_score and i < best_index):
+                    best_score, best_index = score, i
+                if best_score >= beta: break
+        except BrokenProcessPool:
+            return None
+        finally:
+            for future in futures: future.cancel()
+            # Tasks already running cannot be cancelled; retiring the split id
+            # stops them at their next clock test instead of at the deadline.
+            self._split_seq.value += 1
+        return best_score, moves[best_index]
+
     def _alphabeta(self, depth, alpha, beta):
-        if time.time() - self.start_time > min(self.max_time * self.time_limit, 0.95 * self.max_time):
+        self._tick += 1
+        if not self._tick & TIME_CHECK_MASK and self._out_of_time():
             raise TimeoutError()
-        bh = self._board_hash(self.board)
-        tt = self.transposition_table.get(bh)
-        if tt is not None and tt.get('depth', -1) >= depth: return tt['value']
-        if depth == 0 or self._is_terminal(self.board):
-            val = self._evaluate_board(self.board)
-            self.transposition_table[bh] = {'value': val, 'depth': depth}
-            return val
+        key = self._zkey
+        alpha_orig = alpha
+        tt_move = None
+        entry = self._tt_probe(key)
+        if entry is not None:
+            tt_move = entry[5]
+            if entry[2] >= depth:
+                tt_value, flag = entry[1], entry[3]
+                if flag == TT_EXACT: return tt_value
+                if flag == TT_LOWER and tt_value > alpha: alpha = tt_value
+                elif flag == TT_UPPER and tt_value < beta: beta = tt_value
+                if alpha >= beta: return tt_value
+        if depth == 0:
+            return self._qsearch(alpha, beta)
+        # One move generation per node: it decides terminal, feeds mobility if
+        # the node is evaluated, and is the list searched below.
+        legal_moves = self._ply_moves()
+        if not legal_moves or (self._term is not None and self._term()):
+            return self._static_eval(legal_moves)
+        # No null move with only king and pawns left: pawns never promote here,
+        # so such endings are often zugzwang, where passing would be best.
+        if depth >= 3 and beta - alpha <= 1 and not self._in_null and self._flip_side is not None \
+                and self._side_has_minors() and not self._in_check():
+            self._push_null()
+            self._in_null = True
+            try: score = -self._alphabeta(depth - 1 - NULL_MOVE_R, -beta, -beta + 1)
+            finally:
+                self._in_null = False
+                self._pop_null()
+            if score >= beta: return beta
         self.nodes_expanded += 1
-        legal_moves = self._get_legal_moves(self.board)
-        if not legal_moves:
-            val = self._evaluate_board(self.board)
-            self.transposition_table[bh] = {'value': val, 'depth': depth}
-            return val
-        ordered = sorted(legal_moves, key=self._move_sort_key, reverse=True)
-        value = -float('inf')
-        for move in ordered:
-            if hasattr(self.board, 'push'):
-                self.board.push(move); undo_info = True
-            else:
-                new_board = self._make_move(self.board, move)
-                old_board = self.board; self.board = new_board; undo_info = old_board
-            score = -self._alphabeta(depth - 1, -beta, -alpha)
-            if undo_info is True and hasattr(self.board, 'pop'): self.board.pop()
-            elif undo_info is not None: self.board = undo_info
-            if score > value: value = score
+        ordered = self._order_moves(legal_moves, tt_move)
+        value = -INF
+        best_move = None
+        do, undo, search = self._do, self._undo, self._alphabeta
+        for i, move in enumerate(ordered):
+            do(move)
+            try:
+                # PVS: full window for the first (expected best) move, then a
+                # null-window scout for the rest, re-searched only if it lands
+                # strictly inside (alpha, beta).
+                if i == 0:
+                    score = -search(depth - 1, -beta, -alpha)
+                else:
+                    score = -search(depth - 1, -alpha - 1, -alpha)
+                    if alpha < score < beta:
+                        score = -search(depth - 1, -beta, -score)
+            finally: undo(move)
+            if score > value: value, best_move = score, move
             if value > alpha: alpha = value
-            if alpha >= beta: break
-        self.transposition_table[bh] = {'value': value, 'depth': depth}
+            if alpha >= beta:
+                if not _MVV.get(self._captured_of(move), _MVV_UNKNOWN):
+                    self._record_cutoff(move, depth)
+                break
+        self._tt_store(key, value, depth, self._bound_flag(value, alpha_orig, beta), best_move,
+                       entry[6] if entry is not None else None)
+        return value
+
+    def _ply_moves(self):
+        """
+        Legal moves of the current node, in this ply's reusable list. The ply is
+        the number of moves (and null moves) made since the root, which is the
+        depth of the Zobrist key stack; a child only ever touches deeper lists.
+        """
+        ply = len(self._key_stack)
+        if ply >= MAX_PLY: return self._gen_moves()
+        moves = self._move_lists[ply]
+        moves.clear()
+        self._fill_moves(moves)
+        return moves
+
+    def _cached_eval(self):
+        """Static eval cached in the current position's TT entry, or None."""
+        entry = self._tt_probe(self._zkey)
+        return entry[6] if entry is not None else None
+
+    def _static_eval(self, legal_moves=None):
+        """
+        _evaluate_board for the current position, cached in the TT entry's
+        static_eval field so revisited leaves skip the board walk and movegen.
+        Pass the node's legal moves when already generated.
+        """
+        value = self._cached_eval()
+        if value is None:
+            value = self._evaluate_board(self.board, legal_moves)
+            assert isinstance(value, int), "_evaluate_board must return an int"
+            self._tt_store_eval(self._zkey, value)
         return value
 
-    def _move_sort_key(self, move):
-        score = 0
-        for klist in self.KILLER_MOVES.values():
-            if move in klist: score += 1000
-        if hasattr(move, 'is_capture') and getattr(move, 'is_capture'):
-            captured = getattr(move, 'captured', None)
-            if captured:
-                c = str(captured).upper()
-                if c.startswith('P'): score += 20
-                elif c.startswith('B'): score += 70
-                elif c.startswith('N'): score += 70
-                elif c.startswith('K'): score += 600
-            else: score += 50
-        elif hasattr(move, 'captured') and getattr(move, 'captured') is not None:
-            c = str(getattr(move, 'captured')).upper()
-            if c.startswith('P'): score += 20
-            elif c.startswith('B'): score += 70
-            elif c.startswith('N'): score += 70
-            elif c.startswith('K'): score += 600
-            else: score += 40
+    def _push_null(self):
+        """Pass the turn: flip the side to move and its Zobrist key, no board change."""
+        self._flip_side()
+        self._key_stack.append(self._zkey)
+        self._zkey ^= _ZOBRIST_TURN
+
+    def _pop_null(self):
+        self._flip_side()
+        self._zkey = self._key_stack.pop()
+
+    def _qsearch(self, alpha, beta):
+        """
+        Quiescence search: past the horizon, keep resolving captures (best
+        victim first) until the position is quiet, so leaf scores do not stop
+        in the middle of an exchange. The side to move may always stand pat.
+        """
+        self._tick += 1
+        if not self._tick & TIME_CHECK_MASK and self._out_of_time():
+            raise TimeoutError()
+        # A cached eval can stand pat without generating moves; otherwise the
+        # one generation serves both mobility and the capture list.
+        legal_moves = None
+        best = self._cached_eval()
+        if best is None:
+            legal_moves = self._ply_moves()
+            best = self._static_eval(legal_moves)
+        if best >= beta: return best
+        if best > alpha: alpha = best
+        if legal_moves is None: legal_moves = self._ply_moves()
+        captured_of = self._captured_of
+        captures = [m for m in legal_moves if _MVV.get(captured_of(m), _MVV_UNKNOWN)]
+        do, undo, qsearch = self._do, self._undo, self._qsearch
+        for move in self._order_moves(captures):
+            do(move)
+            try: score = -qsearch(-beta, -alpha)
+            finally: undo(move)
+            if score > best: best = score
+            if best > alpha: alpha = best
+            if alpha >= beta: break
+        return best
+
+    @staticmethod
+    def _bound_flag(value, alpha_orig, beta):
+        """Classify a search result against the window it was searched with."""
+        if value <= alpha_orig: return TT_UPPER
+        if value >= beta: return TT_LOWER
+        return TT_EXACT
+
+    def _order_moves(self, legal_moves, tt_move=None):
+        """
+        Yield moves best-first: the TT best move (if legal here), then the rest
+        popped lazily from a heap on _move_sort_key. A cutoff stops the
+        generator, so the tail is never ordered and a TT-move cutoff skips
+        scoring altogether.
+        """
+        skip = -1
+        if tt_move is not None:
+            for i, move in enumerate(legal_moves):
+                if move == tt_move:
+                    skip = i
+                    yield move
+                    break
+        key = self._move_sort_key
+        ply = len(self._key_stack)
+        # The index breaks score ties in generation order and keeps moves out of comparisons.
+        scored = [(-key(move, ply), i, move) for i, move in enumerate(legal_moves) if i != skip]
+        heapq.heapify(scored)
+        while scored:
+            yield heapq.heappop(scored)[2]
+
+    def _tt_probe(self, key):
+        """Return the TT entry stored for key, or None."""
+        tt = self.transposition_table
+        i = key & self._tt_mask
+        entry = tt[i]
+        if entry is not None and entry[0] == key: return entry
+        entry = tt[i | 1]
+        if entry is not None and entry[0] == key: return entry
+        return None
+
+    def _tt_store(self, key, value, depth, flag, best_move=None, static_eval=None):
+        """
+        Store into the depth-preferred slot if it is empty, holds the same
+        position, is stale or is shallower; otherwise into the always-replace slot.
+        """
+        tt = self.transposition_table
+        i = key & self._tt_mask
+        old = tt[i]
+        if old is None or old[0] == key or old[4] != self._tt_gen or depth >= old[2]:
+            tt[i] = (key, value, depth, flag, self._tt_gen, best_move, static_eval)
         else:
-            try:
-                s = str(move)
-                if 'x' in s or 'X' in s: score += 40
-            except: pass
-        return score
+            tt[i | 1] = (key, value, depth, flag, self._tt_gen, best_move, static_eval)
+
+    def _tt_store_eval(self, key, static_eval):
+        """Attach a static eval to key's entry, adding an eval-only entry if there is none."""
+        tt = self.transposition_table
+        i = key & self._tt_mask
+        for j in (i, i | 1):
+            entry = tt[j]
+            if entry is not None and entry[0] == key:
+                tt[j] = entry[:6] + (static_eval,)
+                return
+        self._tt_store(key, 0, TT_DEPTH_NONE, TT_EXACT, None, static_eval)
+
+    def _record_cutoff(self, move, depth):
+        """A quiet move failed high: make it a killer at this ply and credit its history."""
+        mkey = self._move_key(move)
+        killers = self.KILLER_MOVES.setdefault(len(self._key_stack), [])
+        if mkey not in killers:
+            killers.insert(0, mkey)
+            del killers[2:]
+        self._history[mkey] = self._history.get(mkey, 0) + depth * depth
 
+    def _move_sort_key(self, move, ply):
+        """Captures by victim value, then this ply's killers, then quiet moves by history."""
+        victim = _MVV.get(self._captured_of(move), _MVV_UNKNOWN)
+        if victim: return CAPTURE_SCORE + victim
+        mkey = self._move_key(move)
+        if mkey in self.KILLER_MOVES.get(ply, _NO_KILLERS): return KILLER_SCORE
+        return self._history.get(mkey, 0)
+
+
+_WORKER_AGENT = None   # per-process agent reused across root-split tasks (keeps its TT)
+_WORKER_SPLIT = None   # shared id of the live root split, set by _init_worker
+
+def _init_worker(split_seq):
+    """Pool initializer: keep the parent's shared split id for abort checks."""
+    global _WORKER_SPLIT
+    _WORKER_SPLIT = split_seq
+
+def _worker_score(board_state, move, depth, alpha, beta, deadline, split_id):
+    """
+    Root-split task: play move on an unpickled copy of the board and search
+    it to depth with the root window. Returns (score for the mover, nodes).
+    Raises TimeoutError at the deadline or once split_id has been retired.
+    """
+    global _WORKER_AGENT
+    if _WORKER_SPLIT.value != split_id: raise TimeoutError()
+    board = pickle.loads(board_state)
+    if _WORKER_AGENT is None:
+        _WORKER_AGENT = B22ES027(board)
+    else:
+        _WORKER_AGENT.board = board
+        _WORKER_AGENT._bind_adapters()
+    agent = _WORKER_AGENT
+    agent._begin_search(deadline)
+    agent._split_id = split_id
+    agent.nodes_expanded = 0
+    agent._do(move)
+    try: score = -agent._alphabeta(depth - 1, -beta, -alpha)
+    finally: agent._undo(move)
+    return score, agent.nodes_expanded